@@ -0,0 +1,175 @@
+# asr_server.py — 常驻 ASR 进程：模型只加载一次，通过 Unix socket 接收转写任务
+# 协议：每个连接发送一行 {"wav": ..., "out": ...}，返回一行 {"ok": true/false, ...}
+import os, json, argparse, functools, itertools, socketserver, threading, torch, torchaudio
+from concurrent.futures import ThreadPoolExecutor
+
+SOCKET_PATH = os.getenv("WHISPER_SOCK", "/tmp/whisper.sock")
+# 自动检测设备
+device = "cuda" if torch.cuda.is_available() else ("mps" if torch.backends.mps.is_available() else "cpu")
+
+# 默认保持多语种（中文 Space 也要能转写）：GPU 上用 large-v3-turbo（int8_float16），CPU/MPS 上用 small；
+# 纯英文内容可设 WHISPER_MODEL=distil-large-v3 换取更快的贪心解码
+model_name = os.getenv("WHISPER_MODEL") or ("large-v3-turbo" if device == "cuda" else "small")
+
+
+def load_audio(wav):
+    """Decode once to 16 kHz mono float32 so the models skip their own ffmpeg/PyAV pass."""
+    waveform, sr = torchaudio.load(str(wav))
+    if sr != 16000:
+        waveform = torchaudio.functional.resample(waveform, sr, 16000)
+    return waveform.mean(0).numpy()
+
+
+def load_whisper_fallback(device_index=0):
+    """openai-whisper "small"; returns transcribe(wav) in the same format."""
+    import whisper
+
+    model = whisper.load_model("small", device=f"cuda:{device_index}" if device == "cuda" else device)
+
+    def transcribe(wav):
+        # fp16 only on cuda
+        result = model.transcribe(load_audio(wav), fp16=(device == "cuda"))
+        print("Detected language:", result.get("language"))
+        return [
+            {"start": float(seg["start"]), "end": float(seg["end"]), "text": seg["text"].strip()}
+            for seg in result.get("segments", [])
+        ]
+
+    return transcribe
+
+
+def load_transcriber(device_index=0):
+    """Load the model once; returns transcribe(wav) -> [{"start","end","text"}, ...]."""
+    try:
+        from faster_whisper import WhisperModel
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:  # faster-whisper < 1.1
+            BatchedInferencePipeline = None
+        # int8 weights + fp16 activations on cuda
+        compute = "int8_float16" if device == "cuda" else "int8"
+        # distilled models are trained for greedy decoding
+        beam = 1 if model_name.startswith("distil") else 5
+        # CPU 上显式设置 CTranslate2 线程数（先 import torch 时默认可能只有 1 个）；
+        # 每个模型只由一个线程串行调用（服务端每模型一个 worker，transcribe_many 每模型一个线程），
+        # 保持默认 num_workers=1，全部核心给这一路解码
+        cpu_opts = {} if device == "cuda" else {"cpu_threads": os.cpu_count() or 4}
+        print(f"[info] using faster-whisper {model_name}; device = {device}:{device_index}, compute_type = {compute}")
+        model = WhisperModel(model_name, device=device, device_index=device_index, compute_type=compute, **cpu_opts)
+        # VAD 切片后按 batch 送入 encoder
+        pipeline = BatchedInferencePipeline(model=model) if BatchedInferencePipeline is not None else None
+    except Exception as e:
+        print(f"[warn] faster-whisper unavailable ({e}); falling back to openai-whisper.")
+        return load_whisper_fallback(device_index)
+
+    # 推理阶段出错（如设备不支持该 compute_type、CTranslate2 运行时错误）时
+    # 与加载失败一样退回 openai-whisper；备用模型首次需要时才加载
+    fallback = []
+    fallback_lock = threading.Lock()
+
+    def transcribe(wav):
+        audio = load_audio(wav)
+        try:
+            if pipeline is not None:
+                segments, info = pipeline.transcribe(audio, batch_size=8, beam_size=beam, vad_filter=True)
+            else:
+                segments, info = model.transcribe(audio, beam_size=beam, vad_filter=True)
+            # segments 是惰性生成器，解码错误在这里才抛出
+            results = [{"start": seg.start, "end": seg.end, "text": seg.text.strip()} for seg in segments]
+            print("Detected language:", info.language)
+            return results
+        except Exception as e:
+            print(f"[warn] faster-whisper failed on {wav} ({e}); falling back to openai-whisper.")
+            with fallback_lock:
+                if not fallback:
+                    fallback.append(load_whisper_fallback(device_index))
+            return fallback[0](wav)
+
+    return transcribe
+
+
+def load_transcribers(gpus=0, njobs=None):
+    """One model per GPU (gpus=0 means all visible GPUs), never more than njobs; a single model off-cuda."""
+    n = torch.cuda.device_count() if device == "cuda" else 1
+    if gpus > 0:
+        n = min(n, gpus)
+    # 单个文件只需要一个模型，多加载的 GPU 只会白占显存
+    if njobs is not None:
+        n = min(n, njobs)
+    return [load_transcriber(i) for i in range(max(1, n))]
+
+
+def transcribe_many(transcribers, jobs):
+    """Run (wav, out) jobs round-robin across models; each GPU works through its own files."""
+    n = len(transcribers)
+
+    def worker(transcribe, batch):
+        for wav, out in batch:
+            run_job(transcribe, wav, out)
+
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        futures = [ex.submit(functools.partial(worker, transcribers[i]), jobs[i::n]) for i in range(n)]
+        for fut in futures:
+            fut.result()
+
+
+def save_results(results, out):
+    with open(out, "w") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def run_job(transcribe, wav, out):
+    save_results(transcribe(wav), out)
+    print(f"✅ Transcription saved to {out}")
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline())
+            # 轮询分配到各 GPU；每个模型同一时刻只跑一个任务
+            transcribe, executor = self.server.next_worker()
+            executor.submit(run_job, transcribe, job["wav"], job["out"]).result()
+            reply = {"ok": True, "out": job["out"]}
+        except Exception as exc:  # noqa: BLE001
+            reply = {"ok": False, "error": f"{exc.__class__.__name__}: {exc}"}
+        self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class ASRServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, handler, transcribers):
+        super().__init__(path, handler)
+        self.workers = [(t, ThreadPoolExecutor(max_workers=1)) for t in transcribers]
+        self._cycle = itertools.cycle(self.workers)
+        self._lock = threading.Lock()
+
+    def next_worker(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Persistent Whisper transcription server")
+    ap.add_argument("--socket", default=SOCKET_PATH, help=f"Unix socket 路径，默认 {SOCKET_PATH}")
+    ap.add_argument("--gpus", type=int, default=0, help="使用的 GPU 数，每卡一个模型；默认 0 = 全部")
+    args = ap.parse_args()
+
+    transcribers = load_transcribers(args.gpus)
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    with ASRServer(args.socket, JobHandler, transcribers) as srv:
+        print(f"[info] listening on {args.socket} ({len(transcribers)} worker(s))")
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for _, executor in srv.workers:
+                executor.shutdown(wait=False)
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
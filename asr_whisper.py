@@ -1,33 +1,54 @@
-import sys, json, pathlib, torch
+# asr_whisper.py — 若 asr_server.py 在运行则把任务交给常驻模型，否则本进程内加载模型转写
+# 用法: asr_whisper.py <wav> <out.json> [<wav> <out.json> ...] [--gpus N]
+import os, sys, json, socket, argparse, pathlib
+from concurrent.futures import ThreadPoolExecutor
 
-wav = pathlib.Path(sys.argv[1])
-out = pathlib.Path(sys.argv[2])
+ap = argparse.ArgumentParser()
+ap.add_argument("pairs", nargs="+", help="成对的 输入音频 输出 JSON")
+ap.add_argument("--gpus", type=int, default=0, help="本进程加载模型时使用的 GPU 数；默认 0 = 全部（不超过文件数）")
+args = ap.parse_args()
+if len(args.pairs) % 2:
+    ap.error("expected <wav> <out.json> pairs")
+jobs = [
+    (pathlib.Path(w).resolve(), pathlib.Path(o).resolve())
+    for w, o in zip(args.pairs[::2], args.pairs[1::2])
+]
+sock_path = os.getenv("WHISPER_SOCK", "/tmp/whisper.sock")
 
-# 自动检测设备
-device = "cuda" if torch.cuda.is_available() else ("mps" if torch.backends.mps.is_available() else "cpu")
 
-try:
-    from faster_whisper import WhisperModel
-    compute = "float16" if device == "cuda" else "int8"
-    print(f"[info] using faster-whisper; device = {device}, compute_type = {compute}")
-    model = WhisperModel("small", device=device, compute_type=compute)
-    segments, info = model.transcribe(str(wav), vad_filter=True)
-    print("Detected language:", info.language)
-    results = [{"start": seg.start, "end": seg.end, "text": seg.text.strip()} for seg in segments]
-except Exception as e:
-    print(f"[warn] faster-whisper unavailable ({e}); falling back to openai-whisper.")
-    import whisper
+def submit_to_server(wav, out):
+    """Send one job to a running asr_server; returns None when no server is reachable."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(sock_path)
+            s.sendall((json.dumps({"wav": str(wav), "out": str(out)}, ensure_ascii=False) + "\n").encode("utf-8"))
+            line = s.makefile("rb").readline()
+    except OSError as e:
+        print(f"[warn] asr server at {sock_path} unreachable ({e}); loading model locally.")
+        return None
+    return json.loads(line) if line else {"ok": False, "error": "empty reply from asr server"}
 
-    model = whisper.load_model("small", device=device)
-    # fp16 only on cuda
-    result = model.transcribe(str(wav), fp16=(device == "cuda"))
-    results = [
-        {"start": float(seg["start"]), "end": float(seg["end"]), "text": seg["text"].strip()}
-        for seg in result.get("segments", [])
-    ]
-    print("Detected language:", result.get("language"))
 
-with open(out, "w") as f:
-    json.dump(results, f, ensure_ascii=False, indent=2)
+local_jobs = jobs
+failed = False
+if os.path.exists(sock_path):
+    # 并发提交，由服务端按 GPU 轮询分配
+    with ThreadPoolExecutor(max_workers=min(len(jobs), 8)) as ex:
+        replies = list(ex.map(lambda job: submit_to_server(*job), jobs))
+    # 只有服务端没接到的任务才在本进程重跑，已完成的不再重复转写
+    local_jobs = [job for job, reply in zip(jobs, replies) if reply is None]
+    for (wav, out), reply in zip(jobs, replies):
+        if reply is None:
+            continue
+        if reply.get("ok"):
+            print(f"✅ Transcription saved to {out} (via {sock_path})")
+        else:
+            print(f"[ERROR] asr server failed on {wav}: {reply.get('error')}")
+            failed = True
 
-print(f"✅ Transcription saved to {out}")
+if local_jobs:
+    from asr_server import load_transcribers, transcribe_many
+
+    transcribe_many(load_transcribers(args.gpus, len(local_jobs)), local_jobs)
+if failed:
+    sys.exit(1)
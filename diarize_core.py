@@ -0,0 +1,174 @@
+# diarize_core.py — diarize.py / quick_diarize.py 共用：加载 pipeline、推理、输出 CSV/RTTM
+import os, sys, csv, contextlib, pathlib
+import torch
+from pyannote.audio import Pipeline
+from pyannote.audio.core.task import Specifications, Problem, Resolution
+
+PIPELINE_ID = "pyannote/speaker-diarization-3.1"
+
+# torch 2.6+ defaults weights_only=True; allow pyannote checkpoints to load
+try:
+    torch.serialization.add_safe_globals(
+        [torch.torch_version.TorchVersion, Specifications, Problem, Resolution]
+    )
+except Exception:
+    pass
+
+@contextlib.contextmanager
+def hf_offline():
+    # huggingface_hub 在每次请求时读取该开关
+    from huggingface_hub import constants
+    prev = constants.HF_HUB_OFFLINE
+    constants.HF_HUB_OFFLINE = True
+    try:
+        yield
+    finally:
+        constants.HF_HUB_OFFLINE = prev
+
+def from_pretrained(token):
+    try:
+        # pyannote.audio >=4 uses token=
+        return Pipeline.from_pretrained(PIPELINE_ID, token=token)
+    except TypeError:
+        # older signature
+        return Pipeline.from_pretrained(PIPELINE_ID, use_auth_token=token)
+
+def load_pipeline(token):
+    # 先只用本地缓存，跳过 HF Hub 的联网校验；缓存不完整时再联网下载
+    try:
+        with hf_offline():
+            pipe = from_pretrained(token)
+        if pipe is not None:
+            return pipe
+    except (OSError, ValueError):
+        pass
+    return from_pretrained(token)
+
+def to_half(pipe, device):
+    """fp16 weights for the embedding model (and segmentation on CUDA); returns the cast models."""
+    if device not in ("cuda", "mps") or os.getenv("PYANNOTE_FP16", "1") == "0":
+        return []
+    # MPS 上分割模型保持 fp32
+    stages = ("_embedding", "_segmentation") if device == "cuda" else ("_embedding",)
+    models = []
+    for name in stages:
+        stage = getattr(pipe, name, None)
+        model = getattr(stage, "model_", None) or getattr(stage, "model", None)
+        if isinstance(model, torch.nn.Module):
+            models.append(model.half())
+    return models
+
+def prepare_pipeline(token=None):
+    """Load the pipeline (HF_TOKEN or cached login), move it to the best device; returns (pipe, device, half_models)."""
+    try:
+        pipe = load_pipeline(token or os.getenv("HF_TOKEN", None) or True)
+    except Exception as e:
+        print(f"\n[ERROR] 无法下载/加载 {PIPELINE_ID}：", e)
+        print("请确认：1) 已登录 huggingface-cli；2) 已在模型页点击 Access/同意条款；")
+        print("       3) 如在公司/校园网络，检查代理或重试；4) 如缓存损坏可清理后再试：")
+        print("          rm -rf ~/.cache/huggingface/hub/models--pyannote--speaker-diarization-3.1\n")
+        sys.exit(1)
+
+    # 设备选择：CUDA > MPS > CPU
+    device = "cuda" if torch.cuda.is_available() else ("mps" if torch.backends.mps.is_available() else "cpu")
+    pipe.to(torch.device(device))
+    # 固定 embedding batch，按窗口流式送入模型，显存占用恒定；可用 PYANNOTE_EMB_BATCH 按显卡调整
+    pipe.embedding_batch_size = int(os.getenv("PYANNOTE_EMB_BATCH", "32"))
+    half_models = to_half(pipe, device)
+    print(f"[info] device = {device}; embedding batch = {pipe.embedding_batch_size}; fp16 = {bool(half_models)}")
+    return pipe, device, half_models
+
+def is_half_error(e):
+    # fp16 下算子不支持 Half / 输入与权重 dtype 不一致时的 RuntimeError；OOM 等其他错误不重跑
+    if not isinstance(e, RuntimeError) or isinstance(e, getattr(torch.cuda, "OutOfMemoryError", ())):
+        return False
+    msg = str(e)
+    return any(k in msg for k in ("Half", "half", "dtype", "scalar type"))
+
+def run_pipeline(pipe, device, half_models, *args, **kwargs):
+    # 部分算子（如 STFT/fbank）不支持 fp16：仅这类错误恢复 fp32 重跑
+    if half_models:
+        try:
+            with torch.autocast(device_type=device, dtype=torch.float16):
+                return pipe(*args, **kwargs)
+        except RuntimeError as e:
+            if not is_half_error(e):
+                raise
+            print(f"[warn] fp16 diarization failed ({e}); retrying in fp32")
+            for model in half_models:
+                model.float()
+            if device == "cuda":
+                torch.cuda.empty_cache()
+    return pipe(*args, **kwargs)
+
+# normalize output to Annotation (pyannote 4 returns DiarizeOutput)
+def as_annotation(diarization_result):
+    # direct Annotation
+    if hasattr(diarization_result, "itertracks"):
+        return diarization_result
+    # has converter
+    if hasattr(diarization_result, "to_annotation"):
+        try:
+            return diarization_result.to_annotation()
+        except Exception:
+            pass
+    # known attributes on newer pyannote outputs
+    for attr in ("annotation", "diarization", "discrete", "result"):
+        if hasattr(diarization_result, attr):
+            val = getattr(diarization_result, attr)
+            if val is not None:
+                if hasattr(val, "itertracks"):
+                    return val
+                if hasattr(val, "to_annotation"):
+                    try:
+                        return val.to_annotation()
+                    except Exception:
+                        pass
+    # dict-like
+    if isinstance(diarization_result, dict):
+        for key in ("annotation", "diarization", "discrete", "result"):
+            val = diarization_result.get(key)
+            if val is not None:
+                if hasattr(val, "itertracks"):
+                    return val
+                if hasattr(val, "to_annotation"):
+                    try:
+                        return val.to_annotation()
+                    except Exception:
+                        pass
+    # brute force search in __dict__
+    if hasattr(diarization_result, "__dict__"):
+        for val in diarization_result.__dict__.values():
+            if hasattr(val, "itertracks"):
+                return val
+            if hasattr(val, "to_annotation"):
+                try:
+                    return val.to_annotation()
+                except Exception:
+                    pass
+    raise ValueError(f"Unsupported diarization output type: {type(diarization_result)}")
+
+def write_outputs(annotation, out_dir, stem="segments"):
+    """Write <stem>.rttm and <stem>.csv (speaker,start,end); returns (csv_path, rttm_path)."""
+    out_dir = pathlib.Path(out_dir)
+    csv_path, rttm_path = out_dir/f"{stem}.csv", out_dir/f"{stem}.rttm"
+
+    with open(rttm_path, "w") as f:
+        annotation.write_rttm(f)
+
+    rows=[(spk, round(float(turn.start),2), round(float(turn.end),2))
+          for turn, _, spk in annotation.itertracks(yield_label=True)]
+    with open(csv_path, "w", newline="", buffering=1<<20) as f:
+        w=csv.writer(f)
+        w.writerow(("speaker","start","end"))
+        w.writerows(rows)
+    return csv_path, rttm_path
+
+def run(wav, out_dir, pipeline=None, **kwargs):
+    """Diarize a whole file into out_dir/segments.{csv,rttm}; pass a prepared (pipe, device, half_models) to reuse it."""
+    wav_path = pathlib.Path(wav).resolve()
+    out_dir = pathlib.Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pipe, device, half_models = pipeline or prepare_pipeline()
+    annotation = as_annotation(run_pipeline(pipe, device, half_models, wav_path, **kwargs))
+    return write_outputs(annotation, out_dir)
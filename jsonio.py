@@ -0,0 +1,22 @@
+# jsonio.py — post_export.py / smooth_segments.py / topic_seg.py 共用的 JSON 读写：有 orjson 用 orjson，否则用标准库 json
+import json, pathlib
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时用标准库 json
+    orjson = None
+
+def read_json(path):
+    path = pathlib.Path(path)
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json(obj, path):
+    """Pretty-printed (indent 2) UTF-8 JSON, non-ASCII kept as-is with either backend."""
+    path = pathlib.Path(path)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
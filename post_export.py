@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 """Generate transcripts (txt/srt) and simple extractive summaries from ASR output."""
-import json
+import bisect
+import itertools
 import re
 import sys
 from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from jsonio import read_json, write_json
 
 
 def load_asr(base: Path) -> List[Dict[str, Any]]:
@@ -13,42 +16,52 @@ def load_asr(base: Path) -> List[Dict[str, Any]]:
     primary = base / "asr.json"
     quick = base / "asr_quick.json"
     if primary.exists():
-        return json.load(open(primary))
+        return read_json(primary)
     if quick.exists():
         print("[warn] asr.json not found; using asr_quick.json")
-        return json.load(open(quick))
+        return read_json(quick)
     raise FileNotFoundError(f"Missing asr.json (or asr_quick.json) in {base}")
 
 
 def load_chapters(path: Path) -> List[Dict[str, Any]]:
     if not path.exists():
         return []
-    return json.load(open(path))
+    return read_json(path)
 
 
 def ts_fmt(sec: float, srt: bool = False) -> str:
-    hours = int(sec // 3600)
-    minutes = int((sec % 3600) // 60)
-    seconds = int(sec % 60)
-    millis = int(round((sec - int(sec)) * 1000))
+    # Work in integer milliseconds so rounding can carry into the seconds field.
+    millis = int(sec * 1000 + 0.5)
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
     if srt:
         return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
+# Transcript writers stream into a large-buffered file instead of joining one big string.
+WRITE_BUFFER = 1 << 20
+
+
 def write_plain_transcript(asr: List[Dict[str, Any]], path: Path) -> None:
-    lines = [f"[{ts_fmt(seg['start'])}] {seg['text'].strip()}" for seg in asr]
-    path.write_text("\n".join(lines), encoding="utf-8")
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        for i, seg in enumerate(asr):
+            if i:
+                f.write("\n")
+            f.write(f"[{ts_fmt(seg['start'])}] {seg['text'].strip()}")
 
 
 def write_srt(asr: List[Dict[str, Any]], path: Path) -> None:
-    parts = []
-    for i, seg in enumerate(asr, start=1):
-        start = ts_fmt(seg["start"], srt=True)
-        end = ts_fmt(seg["end"], srt=True)
-        text = seg["text"].strip()
-        parts.append(f"{i}\n{start} --> {end}\n{text}\n")
-    path.write_text("\n".join(parts).strip() + "\n", encoding="utf-8")
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        last = len(asr)
+        for i, seg in enumerate(asr, start=1):
+            start = ts_fmt(seg["start"], srt=True)
+            end = ts_fmt(seg["end"], srt=True)
+            block = f"{i}\n{start} --> {end}\n{seg['text'].strip()}"
+            f.write(block + "\n\n" if i < last else block.rstrip() + "\n")
+        if not asr:
+            f.write("\n")
 
 
 STOPWORDS = set(
@@ -115,31 +128,34 @@ STOPWORDS = set(
 )
 
 
+# Keep simple alphanum + CJK; all lowercase for English tokens.
+_TOKEN_RE = re.compile(r"[\w\u4e00-\u9fff']+")
+_SENT_RE = re.compile(r"(?<=[。！？.!?])\s*")
+
+
 def tokenize(sentence: str) -> List[str]:
-    # Keep simple alphanum + CJK; all lowercase for English tokens.
-    return re.findall(r"[\\w\\u4e00-\\u9fff']+", sentence.lower())
+    return _TOKEN_RE.findall(sentence.lower())
 
 
 def split_sentences(text: str) -> List[str]:
-    return [s.strip() for s in re.split(r"(?<=[。！？.!?])\\s*", text) if s.strip()]
+    return [s.strip() for s in _SENT_RE.split(text) if s.strip()]
 
 
 def summarize_text(text: str, max_sentences: int = 3) -> List[str]:
     sentences = split_sentences(text)
     if not sentences:
         return []
-    word_freq = Counter()
-    for sent in sentences:
-        for tok in tokenize(sent):
-            if tok in STOPWORDS:
-                continue
-            word_freq[tok] += 1
+    # Tokenize each sentence once and reuse the filtered tokens for scoring.
+    tokens_per_sent = [
+        [tok for tok in tokenize(sent) if tok not in STOPWORDS] for sent in sentences
+    ]
+    word_freq = Counter(itertools.chain.from_iterable(tokens_per_sent))
     if not word_freq:
         return sentences[:max_sentences]
 
     scores = []
-    for idx, sent in enumerate(sentences):
-        score = sum(word_freq[tok] for tok in tokenize(sent) if tok not in STOPWORDS)
+    for idx, (sent, tokens) in enumerate(zip(sentences, tokens_per_sent)):
+        score = sum(word_freq[tok] for tok in tokens)
         scores.append((score, idx, sent))
 
     # Pick top-scoring sentences, keep original order for readability.
@@ -148,21 +164,41 @@ def summarize_text(text: str, max_sentences: int = 3) -> List[str]:
     return [t[2] for t in top_sorted]
 
 
-def gather_text(asr: List[Dict[str, Any]], start: float, end: float) -> str:
-    parts = []
-    for seg in asr:
-        if seg["end"] <= start or seg["start"] >= end:
-            continue
-        parts.append(seg["text"].strip())
-    return " ".join(parts)
+def build_index(asr: List[Dict[str, Any]]) -> Tuple[List[float], List[float]]:
+    return [seg["start"] for seg in asr], [seg["end"] for seg in asr]
+
+
+def segments_between(
+    asr: List[Dict[str, Any]],
+    index: Tuple[List[float], List[float]],
+    start: float,
+    end: float,
+) -> List[Dict[str, Any]]:
+    """Segments overlapping [start, end); relies on ASR output being time-ordered."""
+    starts, ends = index
+    lo = bisect.bisect_right(ends, start)
+    hi = bisect.bisect_left(starts, end)
+    return asr[lo:hi]
+
+
+def gather_text(
+    asr: List[Dict[str, Any]],
+    start: float,
+    end: float,
+    index: Optional[Tuple[List[float], List[float]]] = None,
+) -> str:
+    if index is None:
+        index = build_index(asr)
+    return " ".join(seg["text"].strip() for seg in segments_between(asr, index, start, end))
 
 
 def summarize_chapters(
     chapters: List[Dict[str, Any]], asr: List[Dict[str, Any]]
 ) -> List[Dict[str, Any]]:
     out = []
+    index = build_index(asr)
     for ch in chapters:
-        text = gather_text(asr, ch["start"], ch["end"])
+        text = gather_text(asr, ch["start"], ch["end"], index)
         summary = summarize_text(text, max_sentences=3)
         out.append(
             {
@@ -178,12 +214,7 @@ def summarize_chapters(
 def write_summary_files(
     base: Path, overall: List[str], chapters: List[Dict[str, Any]]
 ) -> None:
-    json.dump(
-        {"overall": overall, "chapters": chapters},
-        open(base / "summary.json", "w"),
-        ensure_ascii=False,
-        indent=2,
-    )
+    write_json({"overall": overall, "chapters": chapters}, base / "summary.json")
 
     lines = ["# Summary", "## Overall"]
     if overall:
@@ -206,20 +237,19 @@ def write_summary_files(
 def write_markdown_transcript(
     base: Path, asr: List[Dict[str, Any]], chapters: List[Dict[str, Any]]
 ) -> None:
-    lines = ["# Transcript"]
-    if chapters:
-        lines.append("\n## By Chapter")
-        for idx, ch in enumerate(chapters):
-            label = f"{ts_fmt(ch['start'])}-{ts_fmt(ch['end'])}"
-            lines.append(f"\n### {idx+1}. {label}")
+    with open(base / "transcript.md", "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        f.write("# Transcript\n")
+        if chapters:
+            f.write("\n## By Chapter\n")
+            index = build_index(asr)
+            for idx, ch in enumerate(chapters):
+                label = f"{ts_fmt(ch['start'])}-{ts_fmt(ch['end'])}"
+                f.write(f"\n### {idx+1}. {label}\n")
+                for seg in segments_between(asr, index, ch["start"], ch["end"]):
+                    f.write(f"- [{ts_fmt(seg['start'])}] {seg['text'].strip()}\n")
+        else:
             for seg in asr:
-                if seg["end"] <= ch["start"] or seg["start"] >= ch["end"]:
-                    continue
-                lines.append(f"- [{ts_fmt(seg['start'])}] {seg['text'].strip()}")
-    else:
-        lines.extend([f"- [{ts_fmt(seg['start'])}] {seg['text'].strip()}" for seg in asr])
-
-    (base / "transcript.md").write_text("\n".join(lines) + "\n", encoding="utf-8")
+                f.write(f"- [{ts_fmt(seg['start'])}] {seg['text'].strip()}\n")
 
 
 def main():
@@ -1,9 +1,7 @@
 # quick_diarize.py  — 仅处理音频前 N 分钟做快速验证
-import os, sys, csv, argparse, pathlib, torch, torchaudio
-from pyannote.audio import Pipeline
-from pyannote.audio.core.task import Specifications, Problem, Resolution
-from pyannote.core import Annotation
+import argparse, pathlib, torchaudio
 from pyannote.audio.pipelines.utils.hook import ProgressHook
+from diarize_core import prepare_pipeline, run_pipeline, as_annotation, write_outputs
 
 def main():
     ap = argparse.ArgumentParser()
@@ -19,98 +17,28 @@ def main():
     out_dir  = pathlib.Path(args.outdir).resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Allow pyannote checkpoints to load with torch 2.6+ weights_only default
-    try:
-        torch.serialization.add_safe_globals(
-            [torch.torch_version.TorchVersion, Specifications, Problem, Resolution]
-        )
-    except Exception:
-        pass
-
     # 读取前 N 分钟到内存（更快）
     waveform, sr = torchaudio.load(str(wav_path))
     max_samples = int(args.minutes * 60 * sr)
     waveform = waveform[:, :max_samples] if waveform.shape[-1] > max_samples else waveform
 
     # 加载 pipeline（使用环境变量 HF_TOKEN 或已登录的缓存）
-    hf_token = os.getenv("HF_TOKEN", None) or True
-    try:
-        pipe = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", token=hf_token)
-    except TypeError:
-        pipe = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", use_auth_token=hf_token)
-
-    # 设备选择：MPS (Apple 芯片) > CUDA > CPU
-    device = "mps" if torch.backends.mps.is_available() else ("cuda" if torch.cuda.is_available() else "cpu")
-    pipe.to(torch.device(device))
-    print(f"[info] device = {device}; duration ≈ {waveform.shape[-1]/sr:.1f}s")
+    pipe, device, half_models = prepare_pipeline()
+    print(f"[info] duration ≈ {waveform.shape[-1]/sr:.1f}s")
 
     # 跑推理（带进度钩子，小而直观）
     with ProgressHook() as hook:
-        diar = pipe({"waveform": waveform, "sample_rate": sr},
-                    hook=hook,
-                    num_speakers=args.num,
-                    min_speakers=args.min_spk,
-                    max_speakers=args.max_spk)
-
-    def as_annotation(diarization_result):
-        # direct Annotation
-        if hasattr(diarization_result, "itertracks"):
-            return diarization_result
-        # has converter
-        if hasattr(diarization_result, "to_annotation"):
-            try:
-                return diarization_result.to_annotation()
-            except Exception:
-                pass
-        # known attributes on newer pyannote outputs
-        for attr in ("annotation", "diarization", "discrete", "result"):
-            if hasattr(diarization_result, attr):
-                val = getattr(diarization_result, attr)
-                if val is not None:
-                    if hasattr(val, "itertracks"):
-                        return val
-                    if hasattr(val, "to_annotation"):
-                        try:
-                            return val.to_annotation()
-                        except Exception:
-                            pass
-        # dict-like
-        if isinstance(diarization_result, dict):
-            for key in ("annotation", "diarization", "discrete", "result"):
-                val = diarization_result.get(key)
-                if val is not None:
-                    if hasattr(val, "itertracks"):
-                        return val
-                    if hasattr(val, "to_annotation"):
-                        try:
-                            return val.to_annotation()
-                        except Exception:
-                            pass
-        # brute force search in __dict__
-        if hasattr(diarization_result, "__dict__"):
-            for val in diarization_result.__dict__.values():
-                if hasattr(val, "itertracks"):
-                    return val
-                if hasattr(val, "to_annotation"):
-                    try:
-                        return val.to_annotation()
-                    except Exception:
-                        pass
-        raise ValueError(f"Unsupported diarization output type: {type(diarization_result)}")
+        diar = run_pipeline(pipe, device, half_models,
+                            {"waveform": waveform, "sample_rate": sr},
+                            hook=hook,
+                            num_speakers=args.num,
+                            min_speakers=args.min_spk,
+                            max_speakers=args.max_spk)
 
     annotation = as_annotation(diar)
 
     # 输出（CSV + RTTM）
-    csv_path  = out_dir / "segments_quick.csv"
-    rttm_path = out_dir / "segments_quick.rttm"
-
-    with open(csv_path, "w", newline="") as f:
-        w = csv.writer(f); w.writerow(["speaker","start","end"])
-        for turn, _, spk in annotation.itertracks(yield_label=True):
-            w.writerow([spk, round(float(turn.start),2), round(float(turn.end),2)])
-
-    with open(rttm_path, "w") as f:
-        annotation.write_rttm(f)
+    csv_path, rttm_path = write_outputs(annotation, out_dir, stem="segments_quick")
 
     print(f"[done] wrote: {csv_path}")
     print(f"[done] wrote: {rttm_path}")
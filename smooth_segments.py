@@ -1,13 +1,23 @@
 # smooth_segments.py
-import csv, json, sys, pathlib
+import csv, re, sys
+from bisect import bisect_left, bisect_right
+import numpy as np
+try:
+    from numba import njit
+except ImportError:  # 可选依赖，缺失时按纯 Python 执行
+    def njit(*args, **kwargs):
+        return args[0] if args and callable(args[0]) else (lambda f: f)
+from jsonio import read_json
 
 MIN_GAP_SAME_SPK   = 0.6
 SHORT_INTRUSION    = 1.2
 COLLAR             = 0.2
 MIN_SEG_DURATION   = 2.5
 
-FILLERS = set(["嗯","啊","呃","额","对","好","行","ok","okay","yes","yeah",
-               "right","嗯哼","哈哈","lol","哦","哇","噢","唔","嗷"])
+FILLERS = frozenset(["嗯","啊","呃","额","对","好","行","ok","okay","yes","yeah",
+                     "right","嗯哼","哈哈","lol","哦","哇","噢","唔","嗷"])
+# 直接取出不带标点的词（含 CJK），无需 split + strip
+_TOK_RE = re.compile(r"[\w\u4e00-\u9fff']+")
 
 def load_segments_csv(path):
     segs=[]
@@ -18,82 +28,97 @@ def load_segments_csv(path):
                          "start": float(row["start"]), "end": float(row["end"])})
     return sorted(segs, key=lambda x: x["start"])
 
-def load_asr_json(path): return json.load(open(path))
 def dur(s): return s["end"]-s["start"]
 
-def text_stats(asr, s, e):
-    txts=[]
-    for u in asr:
-        if u["end"]<=s or u["start"]>=e: 
-            continue
-        txts.append(u["text"])
-    text=" ".join(txts).strip()
-    tokens=[t.strip("，。！？,.!?… ") for t in text.split()]
-    tokens=[t for t in tokens if t]
-    if tokens:
-        filler=sum(1 for t in tokens if t.lower() in FILLERS)/len(tokens)
+def index_asr(asr):
+    # ASR 输出按时间有序：一次性统计每句的词数/语气词数并做前缀和，
+    # 之后任意 [s,e] 区间只需两次二分 + 两次减法
+    utt_tok=np.zeros(len(asr), np.int64); utt_fill=np.zeros(len(asr), np.int64)
+    for i, u in enumerate(asr):
+        tokens=_TOK_RE.findall(u["text"].lower())
+        utt_tok[i]=len(tokens)
+        utt_fill[i]=sum(1 for t in tokens if t in FILLERS)
+    cum_tok=np.concatenate(([0], np.cumsum(utt_tok))).tolist()
+    cum_fill=np.concatenate(([0], np.cumsum(utt_fill))).tolist()
+    return ([u["start"] for u in asr], [u["end"] for u in asr], cum_tok, cum_fill)
+
+def text_stats(asr_idx, s, e):
+    starts, ends, cum_tok, cum_fill = asr_idx
+    lo=bisect_right(ends, s); hi=bisect_left(starts, e)
+    tok=cum_tok[hi]-cum_tok[lo] if hi>lo else 0
+    if tok:
+        filler=(cum_fill[hi]-cum_fill[lo])/tok
     else:
         filler=1.0
-    return len(tokens), filler
+    return tok, filler
 
-def merge_same_speaker(segs):
-    out=[]
-    for s in segs:
-        if out and s["speaker"]==out[-1]["speaker"] and s["start"]-out[-1]["end"]<MIN_GAP_SAME_SPK:
-            out[-1]["end"]=max(out[-1]["end"], s["end"])
+# 数值部分在 (starts, ends, spk) 数组上跑，spk 为整数说话人 id；有 numba 时 JIT 编译
+@njit(cache=True)
+def merge_same_speaker(starts, ends, spk, gap):
+    n=len(starts); os_=np.empty(n); oe=np.empty(n); ok=np.empty(n, np.int64); k=0
+    for i in range(n):
+        if k>0 and spk[i]==ok[k-1] and starts[i]-oe[k-1]<gap:
+            oe[k-1]=max(oe[k-1], ends[i])
         else:
-            out.append(s.copy())
-    return out
+            os_[k]=starts[i]; oe[k]=ends[i]; ok[k]=spk[i]; k+=1
+    return os_[:k], oe[:k], ok[:k]
 
-def swallow_intrusions(segs, asr):
-    out=[]; i=0
-    while i<len(segs):
-        if 0<i<len(segs)-1:
-            cur=segs[i]; L=segs[i-1]; R=segs[i+1]
-            if cur["speaker"]!=L["speaker"] and cur["speaker"]!=R["speaker"] and dur(cur)<=SHORT_INTRUSION:
-                tok, filler=text_stats(asr, cur["start"], cur["end"])
-                if tok<=3 or filler>=0.5:
-                    if L["speaker"]==R["speaker"]:
-                        L["end"]=R["end"]; i+=2; continue
-                    if dur(L)>=dur(R): L["end"]=max(L["end"],cur["end"])
-                    else: R["start"]=min(R["start"],cur["start"])
-                    i+=1; continue
-        out.append(segs[i]); i+=1
-    return out
+def swallow_intrusions(starts, ends, spk, asr_idx):
+    # 需要查 ASR 文本，留在 Python；原地修改邻段边界，被吞掉的段由 keep 掩码剔除
+    starts=starts.copy(); ends=ends.copy()
+    n=len(starts); keep=np.ones(n, dtype=bool); i=1
+    while i<n-1:
+        c=spk[i]
+        if c!=spk[i-1] and c!=spk[i+1] and ends[i]-starts[i]<=SHORT_INTRUSION:
+            tok, filler=text_stats(asr_idx, starts[i], ends[i])
+            if tok<=3 or filler>=0.5:
+                keep[i]=False
+                if spk[i-1]==spk[i+1]:
+                    ends[i-1]=ends[i+1]; keep[i+1]=False; i+=2; continue
+                if ends[i-1]-starts[i-1]>=ends[i+1]-starts[i+1]: ends[i-1]=max(ends[i-1],ends[i])
+                else: starts[i+1]=min(starts[i+1],starts[i])
+        i+=1
+    return starts[keep], ends[keep], spk[keep]
 
-def apply_collar(segs):
-    out=[segs[0].copy()]
-    for s in segs[1:]:
-        prev=out[-1]
-        if s["start"]-prev["end"]<COLLAR:
-            if dur(prev)>=dur(s): prev["end"]=max(prev["end"], s["end"])
-            else: s["start"]=min(s["start"], prev["start"]); out[-1]=s
+@njit(cache=True)
+def apply_collar(starts, ends, spk, collar):
+    n=len(starts); os_=np.empty(n); oe=np.empty(n); ok=np.empty(n, np.int64); k=0
+    for i in range(n):
+        if k>0 and starts[i]-oe[k-1]<collar:
+            if oe[k-1]-os_[k-1]>=ends[i]-starts[i]: oe[k-1]=max(oe[k-1], ends[i])
+            else: os_[k-1]=min(starts[i], os_[k-1]); oe[k-1]=ends[i]; ok[k-1]=spk[i]
         else:
-            out.append(s.copy())
-    return out
+            os_[k]=starts[i]; oe[k]=ends[i]; ok[k]=spk[i]; k+=1
+    return os_[:k], oe[:k], ok[:k]
 
-def enforce_min_duration(segs):
-    out=[]
-    for s in segs:
-        if dur(s)<MIN_SEG_DURATION and out:
-            out[-1]["end"]=max(out[-1]["end"], s["end"])
+@njit(cache=True)
+def enforce_min_duration(starts, ends, spk, min_dur):
+    n=len(starts); os_=np.empty(n); oe=np.empty(n); ok=np.empty(n, np.int64); k=0
+    for i in range(n):
+        if k>0 and ends[i]-starts[i]<min_dur:
+            oe[k-1]=max(oe[k-1], ends[i])
         else:
-            out.append(s.copy())
-    return out
+            os_[k]=starts[i]; oe[k]=ends[i]; ok[k]=spk[i]; k+=1
+    return os_[:k], oe[:k], ok[:k]
 
 def main(seg_csv, asr_json, out_csv):
     segs = load_segments_csv(seg_csv)
-    asr  = load_asr_json(asr_json)
-    segs = merge_same_speaker(segs)
-    segs = swallow_intrusions(segs, asr)
-    segs = apply_collar(segs)
-    segs = enforce_min_duration(segs)
-    segs = merge_same_speaker(segs)
+    asr  = index_asr(read_json(asr_json))
+    speakers = sorted({s["speaker"] for s in segs})
+    spk_to_id = {name: i for i, name in enumerate(speakers)}
+    starts = np.asarray([s["start"] for s in segs], np.float64)
+    ends   = np.asarray([s["end"] for s in segs], np.float64)
+    spk    = np.asarray([spk_to_id[s["speaker"]] for s in segs], np.int64)
+    starts, ends, spk = merge_same_speaker(starts, ends, spk, MIN_GAP_SAME_SPK)
+    starts, ends, spk = swallow_intrusions(starts, ends, spk, asr)
+    starts, ends, spk = apply_collar(starts, ends, spk, COLLAR)
+    starts, ends, spk = enforce_min_duration(starts, ends, spk, MIN_SEG_DURATION)
+    starts, ends, spk = merge_same_speaker(starts, ends, spk, MIN_GAP_SAME_SPK)
     with open(out_csv,"w",newline="") as f:
         w=csv.DictWriter(f, fieldnames=["speaker","start","end","duration"])
         w.writeheader()
-        for s in segs:
-            w.writerow({**s,"duration": round(dur(s),2)})
+        for st, ed, k in zip(starts.tolist(), ends.tolist(), spk.tolist()):
+            w.writerow({"speaker": speakers[k], "start": st, "end": ed, "duration": round(ed-st,2)})
 
 if __name__=="__main__":
     main(sys.argv[1], sys.argv[2], sys.argv[3])
@@ -12,11 +12,50 @@ with open(csv_path) as f:
     for row in r:
         segs[row["speaker"]].append((float(row["start"]), float(row["end"])))
 
+def ffconcat_quote(path):
+    return "'" + str(path).replace("'", "'\\''") + "'"
+
+def item_path(spkdir, i, st, ed):
+    return spkdir/f"{i:04d}_{st:0.2f}_to_{ed:0.2f}.wav"
+
+def export_each(spkdir, items):
+    # 逐段单独导出（原做法），作为 segment muxer 输出对不上时的兜底
+    for i,(st,ed) in enumerate(items):
+        subprocess.run(["ffmpeg","-y","-ss",str(st),"-t",str(ed-st),"-i",str(src_wav),
+                        "-acodec","copy",str(item_path(spkdir, i, st, ed))], check=True)
+
+# 每个说话人只起一次 ffmpeg：concat 按 inpoint/outpoint 拼接所有片段，
+# 再由 segment muxer 在累计时长处切回单个文件
 for spk, items in segs.items():
     spkdir = out_root/spk; spkdir.mkdir(parents=True, exist_ok=True)
+    listfile = spkdir/"list.ffconcat"
+    with open(listfile, "w") as f:
+        f.write("ffconcat version 1.0\n")
+        for st, ed in items:
+            f.write(f"file {ffconcat_quote(src_wav)}\ninpoint {st:.6f}\noutpoint {ed:.6f}\n")
+    cuts=[]; t=0.0
+    for st, ed in items[:-1]:
+        t += ed-st
+        cuts.append(f"{t:.6f}")
+    # 只有一个片段时不切
+    split_opts = ["-segment_times", ",".join(cuts)] if cuts else ["-segment_time", "86400"]
+    for p in spkdir.glob(".part_*.wav"):  # 上次中断留下的残片会干扰下面的计数
+        p.unlink()
+    try:
+        subprocess.run(["ffmpeg","-y","-f","concat","-safe","0","-i",str(listfile),
+                        "-map","0","-c","copy","-f","segment",*split_opts,
+                        "-reset_timestamps","1",str(spkdir/".part_%04d.wav")], check=True)
+    finally:
+        listfile.unlink()
+    # -c copy 只能在包边界切：极短片段或累计时长的舍入可能多切/少切一段，
+    # 此时片段与文件名对不上，丢弃整批输出改为逐段导出
+    parts = sorted(spkdir.glob(".part_*.wav"))
+    if len(parts) != len(items):
+        print(f"[warn] {spk}: segment muxer wrote {len(parts)} parts for {len(items)} segments; exporting one by one")
+        for p in parts:
+            p.unlink()
+        export_each(spkdir, items)
+        continue
     for i,(st,ed) in enumerate(items):
-        out = spkdir/f"{i:04d}_{st:0.2f}_to_{ed:0.2f}.wav"
-        dur = ed-st
-        subprocess.run(["ffmpeg","-y","-ss",str(st),"-t",str(dur),"-i",str(src_wav),
-                        "-acodec","copy",str(out)], check=True)
+        os.replace(spkdir/f".part_{i:04d}.wav", item_path(spkdir, i, st, ed))
 print("Speakers exported to:", out_root)
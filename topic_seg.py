@@ -1,23 +1,28 @@
 # topic_seg.py
-import json, sys, pathlib, numpy as np
+import sys, pathlib, numpy as np
 from sentence_transformers import SentenceTransformer
 import ruptures as rpt
+from jsonio import read_json, write_json
 
-asr = json.load(open(sys.argv[1]))
+asr = read_json(sys.argv[1])
 out = pathlib.Path(sys.argv[2]); out.parent.mkdir(parents=True, exist_ok=True)
 
 texts  = [r["text"] for r in asr]
 starts = [r["start"] for r in asr]
 ends   = [r["end"]   for r in asr]
 
-min_len = 5        # 每段最少句子数
-n_bkpt  = 8        # 期望主题数(可调/可自适应)
+min_len   = 5      # 每段最少句子数
+pen_scale = 2.0    # BIC 式惩罚系数，越大主题越少
 
 emb = SentenceTransformer("all-MiniLM-L6-v2")
-X = emb.encode(texts, normalize_embeddings=True)
+X = emb.encode(texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True)
+X = np.ascontiguousarray(X, dtype=np.float32)
 
-algo = rpt.KernelCPD(kernel="rbf", min_size=min_len).fit(X)
-bkpts = algo.predict(n_bkpt)
+# 向量已归一化，linear 核即余弦相似度，无需构造 N×N 的 rbf 核矩阵；
+# 惩罚 = 系数 × 总方差 × log N，断点数随真实主题数自适应
+pen = pen_scale * float(X.var(axis=0).sum()) * np.log(len(X))
+algo = rpt.KernelCPD(kernel="linear", min_size=min_len).fit(X)
+bkpts = algo.predict(pen=pen)
 
 chapters=[]; prev=0
 for k in bkpts:
@@ -34,5 +39,5 @@ for ch in chapters:
     else:
         merged.append(ch)
 
-json.dump(merged, open(out,"w"), ensure_ascii=False, indent=2)
+write_json(merged, out)
 print("Chapters ->", out)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Minimal web UI to run the X Space audio pipeline.
-Dependencies: standard library only.
+Dependencies: standard library only (served by uvicorn + a2wsgi when installed).
 
 Usage:
   python3 webapp.py --host 127.0.0.1 --port 8000
@@ -10,25 +10,113 @@ Then open http://127.0.0.1:8000
 from __future__ import annotations
 
 import argparse
-import datetime as dt
+import asyncio
+import atexit
+import codecs
+import gzip
 import html
+import io
 import json
+import os
+import re
+import shutil
+import signal
+import socketserver
 import threading
+import time
 import uuid
+from asyncio.subprocess import PIPE, STDOUT
+from collections import OrderedDict
 from pathlib import Path
-from subprocess import PIPE, STDOUT, Popen, TimeoutExpired
-from typing import Dict, Optional
-from urllib.parse import parse_qs
-from wsgiref.simple_server import make_server
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.util import FileWrapper
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 DEFAULT_OUT = Path.home() / "Downloads" / "spaces"
 LOG_DIR = SCRIPT_DIR / "web_logs"
 LOG_DIR.mkdir(exist_ok=True)
+LOG_BUFFER = 65536
+LOG_FLUSH_INTERVAL = 0.5
+LOG_TAIL_BYTES = 64 * 1024
+MAX_JOBS = 500
+MAX_FORM_BYTES = 64 * 1024
+# Pipelines running at once; further jobs stay "queued" until a slot frees up.
+JOB_WORKERS = min(8, os.cpu_count() or 4)
+# run_space_pipeline.sh announces the output folder as its last line: "Done. See: <dir>".
+TARGET_MARKER = "Done. See:"
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
 
 
-def now_iso() -> str:
-    return dt.datetime.now().replace(microsecond=0).isoformat()
+def iso_time(epoch: int) -> str:
+    """Local time as YYYY-MM-DDTHH:MM:SS, for display only."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(epoch))
+
+
+# Bumped on every change that affects the index page; keys the rendered-HTML cache.
+_JOBS_VERSION = 0
+_VERSION_LOCK = threading.Lock()
+_BOOT_ID = uuid.uuid4().hex[:8]
+# (version, page, gzipped page or None until a gzip client asks for it)
+_INDEX_CACHE: Tuple[int, bytes, Optional[bytes]] = (-1, b"", None)
+
+
+def bump_jobs_version() -> None:
+    global _JOBS_VERSION
+    with _VERSION_LOCK:
+        _JOBS_VERSION += 1
+
+
+def index_etag(version: int, gz: bool = False) -> str:
+    return f'"{_BOOT_ID}-{version}{"-gz" if gz else ""}"'
+
+
+def accepts_gzip(environ) -> bool:
+    return "gzip" in environ.get("HTTP_ACCEPT_ENCODING", "")
+
+
+def gzip_page(page: bytes) -> bytes:
+    # Level 1: pages are small and repetitive, so speed matters more than ratio; mtime=0 keeps output stable.
+    return gzip.compress(page, compresslevel=1, mtime=0)
+
+
+def html_response(start_response, page: bytes, gz: bool, headers=()) -> list:
+    """200 with Content-Length; `page` must already be gzipped when gz is set."""
+    headers = [("Content-Type", "text/html; charset=utf-8"), ("Vary", "Accept-Encoding"), *headers]
+    if gz:
+        headers.append(("Content-Encoding", "gzip"))
+    headers.append(("Content-Length", str(len(page))))
+    start_response("200 OK", headers)
+    return [page]
+
+
+# Output files linked from a job's row: (subdir of the target dir, file name, label).
+_ARTIFACT_LINKS = (
+    ("transcripts", "transcript.txt", "txt"),
+    ("transcripts", "transcript.srt", "srt"),
+    ("transcripts", "transcript.md", "md"),
+    ("summaries", "summary.md", "summary"),
+)
+
+
+def dir_names(path: Path) -> frozenset:
+    """Entry names of a directory from one scandir (empty if it doesn't exist yet)."""
+    try:
+        with os.scandir(path) as it:
+            return frozenset(entry.name for entry in it)
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+
+def load_text(path: Path, limit: int = 1200) -> str:
+    # Only the preview is needed; one extra char tells whether to add the ellipsis.
+    try:
+        with path.open(encoding="utf-8", errors="replace") as f:
+            txt = f.read(limit + 1)
+    except FileNotFoundError:
+        return ""
+    return txt[:limit] + ("..." if len(txt) > limit else "")
 
 
 class Job:
@@ -48,29 +136,126 @@ class Job:
         self.quick_minutes = quick_minutes
         self.status = "queued"
         self.error: Optional[str] = None
-        self.started_at: Optional[str] = None
-        self.finished_at: Optional[str] = None
+        # Whole-second epoch timestamps; the display string is formatted once, on first use.
+        self.started_at_epoch: Optional[int] = None
+        self.finished_at_epoch: Optional[int] = None
+        self._started_iso: Optional[str] = None
         self.target_dir: Optional[str] = None
         self.log_path = LOG_DIR / f"{self.id}.log"
-        self.proc: Optional[Popen] = None
-        self.cancel_requested = False
-        threading.Thread(target=self._run, daemon=True).start()
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        # Set from request threads; job state itself is only written on JOB_LOOP (see _cancel).
+        self.cancel_event = threading.Event()
+        # Rendered view of target_dir, refreshed by _run; finished jobs never touch disk on render.
+        self._outputs_html = "-"
+        self._preview_snapshot: Tuple[str, str] = ("", "")
+        # Log lines are buffered; flush_log() pushes them to disk for render_log.
+        self._logf = None
+        self._log_lock = threading.Lock()
+        self._log_dirty = False
+        # Cached <tr> for the index page as (generation, html); touch() bumps the generation
+        # on every state change, so a row built from older state is never served.
+        self._row_gen = 0
+        self._row_cache: Tuple[int, str] = (-1, "")
+        asyncio.run_coroutine_threadsafe(self._run(), JOB_LOOP)
 
     def cancel(self):
-        self.cancel_requested = True
-        if self.proc and self.proc.poll() is None:
-            try:
-                self.proc.terminate()
-                self.proc.wait(timeout=5)
-            except TimeoutExpired:
-                self.proc.kill()
-            self.status = "canceled"
-            self.finished_at = now_iso()
-            self.error = "canceled by user"
-
-    def _run(self):
+        self.cancel_event.set()
+        asyncio.run_coroutine_threadsafe(self._cancel(), JOB_LOOP).result()
+
+    async def _cancel(self) -> None:
+        # Runs on JOB_LOOP like _run, so status/finished/error keep a single writer.
+        if self.status == "queued":
+            # Still waiting for a slot; _run will see cancel_event and skip it.
+            self._mark_canceled()
+        elif self.status == "running" and self.proc and self.proc.returncode is None:
+            await self._terminate()
+            self._mark_canceled()
+
+    def _mark_canceled(self) -> None:
+        self.flush_log()
+        self.status = "canceled"
+        self.finished_at_epoch = int(time.time())
+        self.error = "canceled by user"
+        self.touch()
+
+    async def _terminate(self) -> None:
+        assert self.proc is not None
+        # The pipeline runs in its own session, so the whole process group goes down:
+        # bash plus whichever stage (python, ffmpeg, yt-dlp) it is waiting on.
+        try:
+            os.killpg(self.proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        else:
+            # proc.wait() would also wait for stdout to close; only the script's own exit
+            # matters here, and returncode is set as soon as it is reaped.
+            deadline = time.monotonic() + 5
+            while self.proc.returncode is None and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if self.proc.returncode is None:
+                try:
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        # Anything that escaped the group may still hold stdout open; end the read loop
+        # now instead of waiting on that pipe, so the job gives up its JOB_SLOTS slot.
+        if self.proc.stdout is not None:
+            self.proc.stdout.feed_eof()
+
+    @property
+    def started_at(self) -> Optional[str]:
+        if self._started_iso is None and self.started_at_epoch is not None:
+            self._started_iso = iso_time(self.started_at_epoch)
+        return self._started_iso
+
+    def touch(self) -> None:
+        self._row_gen += 1
+        bump_jobs_version()
+
+    def refresh_artifacts(self) -> None:
+        if not self.target_dir:
+            return
+        base = Path(self.target_dir)
+        links = []
+        if base.exists():
+            links.append(("dir", base.as_uri()))
+        # One directory listing per subdir instead of a stat per artifact.
+        names = {sub: dir_names(base / sub) for sub in ("transcripts", "summaries")}
+        for sub, name, label in _ARTIFACT_LINKS:
+            if name in names[sub]:
+                links.append((label, (base / sub / name).as_uri()))
+        self._outputs_html = (
+            " | ".join(f"<a href='{uri}' target='_blank'>{label}</a>" for label, uri in links)
+            or html.escape(self.target_dir)
+        )
+        summary = transcript = ""
+        if "summary.md" in names["summaries"]:
+            summary = load_text(base / "summaries" / "summary.md", limit=800)
+        if "transcript.txt" in names["transcripts"]:
+            transcript = load_text(base / "transcripts" / "transcript.txt", limit=800)
+        self._preview_snapshot = (summary, transcript)
+
+    async def _refresh_artifacts_async(self) -> None:
+        # scandir + preview reads are blocking disk I/O; keep them off JOB_LOOP so the
+        # other jobs' output keeps flowing meanwhile.
+        await asyncio.get_running_loop().run_in_executor(None, self.refresh_artifacts)
+
+    def flush_log(self) -> None:
+        with self._log_lock:
+            if self._logf is not None and self._log_dirty:
+                self._logf.flush()
+                self._log_dirty = False
+
+    async def _run(self):
+        async with JOB_SLOTS:
+            if self.cancel_event.is_set():
+                return
+            await self._run_pipeline()
+
+    async def _run_pipeline(self):
         self.status = "running"
-        self.started_at = now_iso()
+        self.started_at_epoch = int(time.time())
+        self.touch()
         cmd = [
             "bash",
             str(SCRIPT_DIR / "run_space_pipeline.sh"),
@@ -80,21 +265,59 @@ class Job:
             "1" if self.quick_mode else "0",
             str(self.quick_minutes),
         ]
+        if shutil.which("stdbuf"):
+            # Keep the pipeline's stdout line-buffered even though it writes to a pipe.
+            cmd = ["stdbuf", "-oL", "-eL", *cmd]
         try:
-            with self.log_path.open("w", encoding="utf-8") as logf:
+            with self.log_path.open("w", encoding="utf-8", buffering=LOG_BUFFER) as logf:
                 logf.write(f"[{self.started_at}] CMD: {' '.join(cmd)}\n")
-                self.proc = Popen(cmd, cwd=str(SCRIPT_DIR), stdout=PIPE, stderr=STDOUT, text=True)
-                assert self.proc.stdout is not None
-                for line in self.proc.stdout:
-                    logf.write(line)
-                    logf.flush()
-                    if "See:" in line:
-                        self.target_dir = line.split("See:", 1)[-1].strip()
-                    if self.cancel_requested:
-                        break
-                self.proc.wait()
-                self.finished_at = now_iso()
-                if self.cancel_requested:
+                self._logf = logf
+                self._log_dirty = True
+                try:
+                    self.proc = await asyncio.create_subprocess_exec(
+                        *cmd, cwd=str(SCRIPT_DIR), stdout=PIPE, stderr=STDOUT, start_new_session=True
+                    )
+                    assert self.proc.stdout is not None
+                    # Read whatever is available rather than per line: progress bars redraw with
+                    # bare \r, which the decoder turns into \n like text-mode Popen did.
+                    decoder = io.IncrementalNewlineDecoder(
+                        codecs.getincrementaldecoder("utf-8")("replace"), translate=True
+                    )
+                    pending = ""
+                    while True:
+                        chunk = await self.proc.stdout.read(LOG_BUFFER)
+                        text = decoder.decode(chunk, final=not chunk)
+                        if text:
+                            with self._log_lock:
+                                logf.write(text)
+                                self._log_dirty = True
+                        if self.target_dir is None and (text or pending):
+                            lines = (pending + text).split("\n")
+                            pending = lines.pop() if chunk else ""
+                            for line in lines:
+                                if line.startswith(TARGET_MARKER):
+                                    self.target_dir = line[len(TARGET_MARKER) :].strip()
+                                    self.flush_log()
+                                    await self._refresh_artifacts_async()
+                                    self.touch()
+                                    break
+                        if not chunk or self.cancel_event.is_set():
+                            break
+                finally:
+                    # Push the buffered tail to disk before any terminal status is published,
+                    # or /logfile would report "done"/"error" while the last lines are missing.
+                    with self._log_lock:
+                        logf.flush()
+                        self._log_dirty = False
+                        self._logf = None
+                if self.cancel_event.is_set():
+                    if self.proc.returncode is None:
+                        # Canceled while the process was still starting, before _cancel could see it.
+                        await self._terminate()
+                else:
+                    await self.proc.wait()
+                self.finished_at_epoch = int(time.time())
+                if self.cancel_event.is_set():
                     self.status = "canceled"
                     self.error = "canceled by user"
                 elif self.proc.returncode == 0:
@@ -102,222 +325,440 @@ class Job:
                 else:
                     self.status = "error"
                     self.error = f"exit {self.proc.returncode}"
+                await self._refresh_artifacts_async()
+                self.touch()
         except Exception as exc:  # noqa: BLE001
-            self.finished_at = now_iso()
-            self.status = "error"
-            self.error = f"{exc.__class__.__name__}: {exc}"
             with self.log_path.open("a", encoding="utf-8") as logf:
                 logf.write(f"\n[ERROR] {exc}\n")
+            self.finished_at_epoch = int(time.time())
+            self.status = "error"
+            self.error = f"{exc.__class__.__name__}: {exc}"
+            self.touch()
+
+
+# Every pipeline subprocess is driven from this one event loop thread, instead of a thread
+# parked in read() per job; JOB_SLOTS keeps at most JOB_WORKERS of them running.
+JOB_LOOP = asyncio.new_event_loop()
+JOB_SLOTS = asyncio.Semaphore(JOB_WORKERS)
+threading.Thread(target=JOB_LOOP.run_forever, daemon=True).start()
 
 
-JOBS: Dict[str, Job] = {}
+# Insertion-ordered so the index renders newest-first without sorting; capped at MAX_JOBS.
+JOBS: OrderedDict[str, Job] = OrderedDict()
+# Held for every JOBS mutation and for snapshots taken to iterate it; single lookups don't need it.
+JOBS_LOCK = threading.Lock()
+
+
+def jobs_snapshot() -> List[Job]:
+    with JOBS_LOCK:
+        return list(JOBS.values())
+
+
+def flush_logs_forever() -> None:
+    """Background flusher so buffered log lines reach disk even while a job is quiet."""
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL)
+        for job in jobs_snapshot():
+            job.flush_log()
+
+
+def register_job(job: Job) -> None:
+    evicted = None
+    with JOBS_LOCK:
+        if len(JOBS) >= MAX_JOBS:
+            # Evict the oldest finished job; running/queued jobs are never dropped.
+            for old_id, old in JOBS.items():
+                if old.status in {"done", "error", "canceled"}:
+                    evicted = JOBS.pop(old_id)
+                    break
+        JOBS[job.id] = job
+    if evicted:
+        evicted.log_path.unlink(missing_ok=True)
+    bump_jobs_version()
+
+
+@atexit.register
+def kill_running_jobs() -> None:
+    # Pipelines run in their own sessions and no longer get the terminal's Ctrl-C;
+    # take them down with the server as before.
+    for job in jobs_snapshot():
+        if job.proc is not None and job.proc.returncode is None:
+            try:
+                os.killpg(job.proc.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+# The page shell never changes: build it once at import and splice bodies between.
+_HEAD = (
+    "<!doctype html><html><head><meta charset='utf-8'>"
+    "<title>Space Pipeline</title>"
+    "<style>"
+    "body{font-family:Menlo,monospace;margin:24px;}"
+    "input,button,select{font-size:14px;padding:6px;}"
+    "table{border-collapse:collapse;width:100%;margin-top:16px;}"
+    "th,td{border:1px solid #ccc;padding:6px;text-align:left;}"
+    "th{background:#f5f5f5;}"
+    ".status-running{color:#d9822b;}"
+    ".status-done{color:#107a3c;}"
+    ".status-error{color:#c23030;}"
+    ".status-canceled{color:#8a8a8a;}"
+    ".actions form{display:inline; margin-right:4px;}"
+    ".preview{background:#f7f7f7;padding:8px;border:1px solid #ddd;max-height:200px;overflow:auto;}"
+    "</style>"
+    "<script>"
+    "const formFields=['space_url','browser','out_root','quick_minutes'];"
+    "function saveForm(){try{formFields.forEach(f=>{const el=document.getElementById(f);if(el) localStorage.setItem('spacepipe_'+f, el.value);});const q=document.getElementById('quick');if(q) localStorage.setItem('spacepipe_quick', q.checked?'1':'0');}catch(e){}}"
+    "function loadForm(){try{formFields.forEach(f=>{const el=document.getElementById(f);const v=localStorage.getItem('spacepipe_'+f);if(el&&v!==null) el.value=v;});const q=document.getElementById('quick');const qv=localStorage.getItem('spacepipe_quick');if(q&&qv!==null) q.checked=(qv==='1');}catch(e){}}"
+    "let timer=null,etag=null;"
+    "function setAutoRefresh(on){"
+    "  const box=document.getElementById('auto');"
+    "  if(on===undefined) on=box.checked;"
+    "  if(on){ timer=setInterval(refreshJobs,5000); } else if(timer){ clearInterval(timer); }"
+    "}"
+    "function refreshJobs(){"
+    "  fetch('/jobs.json',{cache:'no-store',headers:etag?{'If-None-Match':etag}:{}}).then(r=>{"
+    "    if(r.status!==200) return;"
+    "    etag=r.headers.get('ETag');"
+    "    return r.json().then(patchRows);"
+    "  }).catch(()=>{});"
+    "}"
+    # Active rows are patched in place; a new, finished or newly targeted job needs the full row, so reload.
+    "function patchRows(jobs){"
+    "  const seen=new Set();"
+    "  for(const j of jobs){"
+    "    const tr=document.querySelector(\"tr[data-id='\"+j.id+\"']\");"
+    "    if(!tr||tr.querySelector(\"[data-f='target']\").textContent!==(j.target_dir||'-')) return location.reload();"
+    "    const st=tr.querySelector(\"[data-f='status']\");"
+    "    st.textContent=j.status+(j.error?' — '+j.error:'');st.className='status-'+j.status;"
+    "    tr.querySelector(\"[data-f='started']\").textContent=j.started_at||'-';"
+    "    seen.add(j.id);"
+    "  }"
+    "  for(const st of document.querySelectorAll(\"[data-f='status']\")){"
+    "    if((st.className==='status-queued'||st.className==='status-running')&&!seen.has(st.parentNode.dataset.id)) return location.reload();"
+    "  }"
+    "}"
+    "function tailLog(id,offset){"
+    "  const pre=document.getElementById('log'),st=document.getElementById('status');"
+    "  const dec=new TextDecoder();let skip=offset>0;"
+    "  const next=s=>{ if(s==='queued'||s==='running') setTimeout(poll,1000); };"
+    "  function poll(){"
+    "    fetch('/logfile?id='+encodeURIComponent(id),{cache:'no-store',headers:{Range:'bytes='+offset+'-'}}).then(r=>{"
+    "      const s=r.headers.get('X-Job-Status');if(s&&st) st.textContent=s;"
+    "      if(r.status!==206) return next(s);"
+    "      return r.arrayBuffer().then(buf=>{"
+    "        offset+=buf.byteLength;let text=dec.decode(buf,{stream:true});"
+    "        if(skip&&text){ const i=text.indexOf('\\n');if(i<0) return next(s);text=text.slice(i+1);skip=false; }"
+    "        if(text) pre.appendChild(document.createTextNode(text));"
+    "        next(s);"
+    "      });"
+    "    }).catch(()=>setTimeout(poll,5000));"
+    "  }"
+    "  poll();"
+    "}"
+    "window.onload=()=>{ loadForm(); const box=document.getElementById('auto'); if(box) setAutoRefresh(box.checked); document.querySelectorAll('input').forEach(el=>el.addEventListener('change', saveForm)); document.querySelectorAll('input').forEach(el=>el.addEventListener('input', saveForm)); };"
+    "</script>"
+    "</head><body>"
+).encode("utf-8")
+_TAIL = b"</body></html>"
 
 
 def html_page(body: str) -> bytes:
-    return (
-        f"<!doctype html><html><head><meta charset='utf-8'>"
-        f"<title>Space Pipeline</title>"
-        f"<style>"
-        f"body{{font-family:Menlo,monospace;margin:24px;}}"
-        f"input,button,select{{font-size:14px;padding:6px;}}"
-        f"table{{border-collapse:collapse;width:100%;margin-top:16px;}}"
-        f"th,td{{border:1px solid #ccc;padding:6px;text-align:left;}}"
-        f"th{{background:#f5f5f5;}}"
-        f".status-running{{color:#d9822b;}}"
-        f".status-done{{color:#107a3c;}}"
-        f".status-error{{color:#c23030;}}"
-        f".status-canceled{{color:#8a8a8a;}}"
-        f".actions form{{display:inline; margin-right:4px;}}"
-        f".preview{{background:#f7f7f7;padding:8px;border:1px solid #ddd;max-height:200px;overflow:auto;}}"
-        f"</style>"
-        f"<script>"
-        f"const formFields=['space_url','browser','out_root','quick_minutes'];"
-        f"function saveForm(){{try{{formFields.forEach(f=>{{const el=document.getElementById(f);if(el) localStorage.setItem('spacepipe_'+f, el.value);}});const q=document.getElementById('quick');if(q) localStorage.setItem('spacepipe_quick', q.checked?'1':'0');}}catch(e){{}}}}"
-        f"function loadForm(){{try{{formFields.forEach(f=>{{const el=document.getElementById(f);const v=localStorage.getItem('spacepipe_'+f);if(el&&v!==null) el.value=v;}});const q=document.getElementById('quick');const qv=localStorage.getItem('spacepipe_quick');if(q&&qv!==null) q.checked=(qv==='1');}}catch(e){{}}}}"
-        f"let timer=null;"
-        f"function setAutoRefresh(on){{"
-        f"  const box=document.getElementById('auto');"
-        f"  if(on===undefined) on=box.checked;"
-        f"  if(on){{ timer=setInterval(()=>location.reload(),5000); }} else if(timer){{ clearInterval(timer); }}"
-        f"}}"
-        f"window.onload=()=>{{ loadForm(); const box=document.getElementById('auto'); if(box) setAutoRefresh(box.checked); document.querySelectorAll('input').forEach(el=>el.addEventListener('change', saveForm)); document.querySelectorAll('input').forEach(el=>el.addEventListener('input', saveForm)); }};"
-        f"</script>"
-        f"</head><body>{body}</body></html>"
-    ).encode("utf-8")
-
-
-def render_index(msg: str = "") -> bytes:
-    def load_text(path: Path, limit: int = 1200) -> str:
-        if not path.exists():
-            return ""
-        txt = path.read_text(encoding="utf-8", errors="replace")
-        return txt[:limit] + ("..." if len(txt) > limit else "")
-
-    def outputs_cell(job: Job) -> str:
-        if not job.target_dir:
-            return "-"
-        base = Path(job.target_dir)
-        links = []
-        if base.exists():
-            links.append(f"<a href='{base.as_uri()}' target='_blank'>dir</a>")
-        for rel, label in [
-            ("transcripts/transcript.txt", "txt"),
-            ("transcripts/transcript.srt", "srt"),
-            ("transcripts/transcript.md", "md"),
-            ("summaries/summary.md", "summary"),
-        ]:
-            p = base / rel
-            if p.exists():
-                links.append(f"<a href='{p.as_uri()}' target='_blank'>{label}</a>")
-        return " | ".join(links) if links else html.escape(job.target_dir)
-
-    def preview_cell(job: Job) -> str:
-        if not job.target_dir:
-            return "-"
-        base = Path(job.target_dir)
-        summary = load_text(base / "summaries" / "summary.md", limit=800)
-        transcript = load_text(base / "transcripts" / "transcript.txt", limit=800)
-        parts = []
-        if summary:
-            parts.append("<div><strong>Summary</strong><div class='preview'>" + html.escape(summary) + "</div></div>")
-        if transcript:
-            parts.append("<div style='margin-top:6px;'><strong>Transcript</strong><div class='preview'>" + html.escape(transcript) + "</div></div>")
-        return "".join(parts) if parts else "-"
-
-    def outputs_cell(job: Job) -> str:
-        if not job.target_dir:
-            return "-"
-        base = Path(job.target_dir)
-        links = []
-        if base.exists():
-            links.append(f"<a href='{base.as_uri()}' target='_blank'>dir</a>")
-        for rel, label in [
-            ("transcripts/transcript.txt", "txt"),
-            ("transcripts/transcript.srt", "srt"),
-            ("transcripts/transcript.md", "md"),
-            ("summaries/summary.md", "summary"),
-        ]:
-            p = base / rel
-            if p.exists():
-                links.append(f"<a href='{p.as_uri()}' target='_blank'>{label}</a>")
-        return " | ".join(links) if links else html.escape(job.target_dir)
-
-    rows = []
-    for job in sorted(JOBS.values(), key=lambda j: j.started_at or "", reverse=True):
-        status_class = (
-            "status-done"
-            if job.status == "done"
-            else "status-running"
-            if job.status == "running"
-            else "status-error"
-            if job.status == "error"
-            else "status-canceled"
-            if job.status == "canceled"
-            else ""
+    return _HEAD + body.encode("utf-8") + _TAIL
+
+
+_FORM_HTML = (
+    "<h2>Run pipeline</h2>"
+    "<form method='POST' action='/run'>"
+    "<div><label>Space URL: <input id='space_url' name='space_url' size='80' required></label></div>"
+    "<div style='margin-top:8px;'>"
+    "<label>Browser (cookies): <input id='browser' name='browser' value='chrome'></label>"
+    "</div>"
+    "<div style='margin-top:8px;'>"
+    f"<label>Out root: <input id='out_root' name='out_root' value='{html.escape(str(DEFAULT_OUT))}' size='60'></label>"
+    "</div>"
+    "<div style='margin-top:8px;'>"
+    "<label><input id='quick' type='checkbox' name='quick' value='1'> Quick mode (front minutes only)</label>"
+    "<label style='margin-left:12px;'>Minutes: <input id='quick_minutes' name='quick_minutes' value='2' size='4'></label>"
+    "</div>"
+    "<div style='margin-top:12px;'><button type='submit'>Start</button></div>"
+    "</form>"
+    "<div style='margin-top:12px;'>"
+    "<button onclick='location.reload()'>Refresh</button>"
+    "<label style='margin-left:12px;'><input type='checkbox' id='auto' checked onchange='setAutoRefresh(this.checked)'> Auto 5s</label>"
+    "</div>"
+    "<h2>Jobs</h2>"
+    "<table><tr><th>ID</th><th>URL</th><th>Browser</th><th>Mode</th><th>Started</th>"
+    "<th>Status</th><th>Target Dir</th><th>Outputs</th><th>Preview</th><th>Actions</th><th>Log</th></tr>"
+).encode("utf-8")
+
+
+def preview_cell(job: Job) -> str:
+    if not job.target_dir:
+        return "-"
+    summary, transcript = job._preview_snapshot
+    parts = []
+    if summary:
+        parts.append("<div><strong>Summary</strong><div class='preview'>" + html.escape(summary) + "</div></div>")
+    if transcript:
+        parts.append("<div style='margin-top:6px;'><strong>Transcript</strong><div class='preview'>" + html.escape(transcript) + "</div></div>")
+    return "".join(parts) if parts else "-"
+
+
+def render_row(job: Job) -> str:
+    """The job's <tr>, cached on the job until its next state change."""
+    # Read the generation before the fields: if touch() lands mid-build, the row is
+    # cached under the old generation and rebuilt on the next render.
+    gen = job._row_gen
+    cached_gen, cached = job._row_cache
+    if cached_gen == gen:
+        return cached
+    status_class = (
+        "status-done"
+        if job.status == "done"
+        else "status-running"
+        if job.status == "running"
+        else "status-error"
+        if job.status == "error"
+        else "status-canceled"
+        if job.status == "canceled"
+        else "status-queued"
+    )
+    log_link = f"<a href='/log?id={job.id}' target='_blank'>log</a>"
+    target = html.escape(job.target_dir) if job.target_dir else "-"
+    status_text = html.escape(job.status)
+    if job.error:
+        status_text += f" — {html.escape(job.error)}"
+    actions = []
+    if job.status in {"queued", "running"}:
+        actions.append(
+            f"<form method='POST' action='/cancel'>"
+            f"<input type='hidden' name='id' value='{job.id}'>"
+            f"<button type='submit'>Cancel</button>"
+            f"</form>"
         )
-        log_link = f"<a href='/log?id={job.id}' target='_blank'>log</a>"
-        target = html.escape(job.target_dir) if job.target_dir else "-"
-        status_text = html.escape(job.status)
-        if job.error:
-            status_text += f" — {html.escape(job.error)}"
-        actions = []
-        if job.status in {"queued", "running"}:
-            actions.append(
-                f"<form method='POST' action='/cancel'>"
-                f"<input type='hidden' name='id' value='{job.id}'>"
-                f"<button type='submit'>Cancel</button>"
-                f"</form>"
-            )
-        if job.status in {"error", "done", "canceled"}:
-            actions.append(
-                f"<form method='POST' action='/retry'>"
-                f"<input type='hidden' name='id' value='{job.id}'>"
-                f"<button type='submit'>Retry</button>"
-                f"</form>"
-            )
-        rows.append(
-            "<tr>"
-            f"<td>{job.id}</td>"
-            f"<td>{html.escape(job.space_url)}</td>"
-            f"<td>{html.escape(job.browser)}</td>"
-            f"<td>{'quick' if job.quick_mode else 'full'}</td>"
-            f"<td>{job.started_at or '-'}</td>"
-            f"<td class='{status_class}'>{status_text}</td>"
-            f"<td>{target}</td>"
-            f"<td>{outputs_cell(job)}</td>"
-            f"<td>{preview_cell(job)}</td>"
-            f"<td class='actions'>{''.join(actions) or '-'}</td>"
-            f"<td>{log_link}</td>"
-            "</tr>"
+    if job.status in {"error", "done", "canceled"}:
+        actions.append(
+            f"<form method='POST' action='/retry'>"
+            f"<input type='hidden' name='id' value='{job.id}'>"
+            f"<button type='submit'>Retry</button>"
+            f"</form>"
         )
-
-    body = (
-        ("<p style='color:#107a3c;'>%s</p>" % html.escape(msg)) if msg else ""
+    row = (
+        f"<tr data-id='{job.id}'>"
+        f"<td>{job.id}</td>"
+        f"<td>{html.escape(job.space_url)}</td>"
+        f"<td>{html.escape(job.browser)}</td>"
+        f"<td>{'quick' if job.quick_mode else 'full'}</td>"
+        f"<td data-f='started'>{job.started_at or '-'}</td>"
+        f"<td data-f='status' class='{status_class}'>{status_text}</td>"
+        f"<td data-f='target'>{target}</td>"
+        f"<td>{job._outputs_html}</td>"
+        f"<td>{preview_cell(job)}</td>"
+        f"<td class='actions'>{''.join(actions) or '-'}</td>"
+        f"<td>{log_link}</td>"
+        "</tr>"
     )
-    body += (
-        "<h2>Run pipeline</h2>"
-        "<form method='POST' action='/run'>"
-        "<div><label>Space URL: <input id='space_url' name='space_url' size='80' required></label></div>"
-        "<div style='margin-top:8px;'>"
-        "<label>Browser (cookies): <input id='browser' name='browser' value='chrome'></label>"
-        "</div>"
-        "<div style='margin-top:8px;'>"
-        f"<label>Out root: <input id='out_root' name='out_root' value='{html.escape(str(DEFAULT_OUT))}' size='60'></label>"
-        "</div>"
-        "<div style='margin-top:8px;'>"
-        "<label><input id='quick' type='checkbox' name='quick' value='1'> Quick mode (front minutes only)</label>"
-        "<label style='margin-left:12px;'>Minutes: <input id='quick_minutes' name='quick_minutes' value='2' size='4'></label>"
-        "</div>"
-        "<div style='margin-top:12px;'><button type='submit'>Start</button></div>"
-        "</form>"
-        "<div style='margin-top:12px;'>"
-        "<button onclick='location.reload()'>Refresh</button>"
-        "<label style='margin-left:12px;'><input type='checkbox' id='auto' checked onchange='setAutoRefresh(this.checked)'> Auto 5s</label>"
-        "</div>"
-        "<h2>Jobs</h2>"
-        "<table><tr><th>ID</th><th>URL</th><th>Browser</th><th>Mode</th><th>Started</th>"
-        "<th>Status</th><th>Target Dir</th><th>Outputs</th><th>Preview</th><th>Actions</th><th>Log</th></tr>"
-        + ("\n".join(rows) if rows else "<tr><td colspan='11'>No jobs yet.</td></tr>")
-        + "</table>"
+    job._row_cache = (gen, row)
+    return row
+
+
+def render_index(msg: str = "", gz: bool = False) -> bytes:
+    """Index page, gzipped if gz; both forms are cached until the jobs version changes."""
+    global _INDEX_CACHE
+    if msg:
+        page = _render_index(msg)
+        return gzip_page(page) if gz else page
+    # Read the version before building so a concurrent change invalidates this render.
+    version = _JOBS_VERSION
+    cached_version, page, page_gz = _INDEX_CACHE
+    if cached_version != version:
+        page, page_gz = _render_index(), None
+    if gz and page_gz is None:
+        page_gz = gzip_page(page)
+    _INDEX_CACHE = (version, page, page_gz)
+    return page_gz if gz else page
+
+
+def _render_index(msg: str = "") -> bytes:
+    notice = ("<p style='color:#107a3c;'>%s</p>" % html.escape(msg)) if msg else ""
+    rows = "".join(render_row(job) for job in reversed(jobs_snapshot()))
+    table = rows or "<tr><td colspan='11'>No jobs yet.</td></tr>"
+    return b"".join(
+        (_HEAD, notice.encode("utf-8"), _FORM_HTML, table.encode("utf-8"), b"</table>", _TAIL)
     )
-    return html_page(body)
 
 
 def render_log(job_id: str) -> bytes:
     job = JOBS.get(job_id)
     if not job:
         return html_page(f"<p>Job {html.escape(job_id)} not found.</p>")
-    if not job.log_path.exists():
-        return html_page(f"<p>Log not ready for job {html.escape(job_id)}.</p>")
-    content = job.log_path.read_text(encoding="utf-8", errors="replace")
+    # Only the shell is rendered here; the browser pulls the last LOG_TAIL_BYTES
+    # (and anything appended later) from /logfile and inserts it as text.
+    # A queued job has no log yet; the poller waits for it from offset 0.
+    try:
+        size = job.log_path.stat().st_size
+    except FileNotFoundError:
+        # Not started yet, or evicted (log unlinked) since the lookup above.
+        size = 0
+    start = max(0, size - LOG_TAIL_BYTES)
     body = (
         f"<p><a href='/'>Back</a></p>"
-        f"<h3>Job {html.escape(job_id)} — {html.escape(job.status)}</h3>"
-        "<pre style='background:#f7f7f7;padding:12px;border:1px solid #ddd;white-space:pre-wrap;'>"
-        f"{html.escape(content)}</pre>"
+        f"<h3>Job {html.escape(job_id)} — <span id='status'>{html.escape(job.status)}</span></h3>"
+        + (f"<p>(showing the last {LOG_TAIL_BYTES // 1024} KB)</p>" if start else "")
+        + "<pre id='log' style='background:#f7f7f7;padding:12px;border:1px solid #ddd;white-space:pre-wrap;'></pre>"
+        f"<script>tailLog({json.dumps(job_id)}, {start});</script>"
     )
     return html_page(body)
 
 
+class FileRange:
+    """File reader that stops after `length` bytes, so a log still being written can't overrun Content-Length."""
+
+    def __init__(self, f, length: int):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self.f.close()
+
+
+class WholeFile(FileRange):
+    """FileRange over the whole file that also exposes fileno(), so a server's
+    wsgi.file_wrapper can use sendfile (bounded by Content-Length)."""
+
+    def fileno(self) -> int:
+        return self.f.fileno()
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Single `bytes=` range as inclusive (start, end); None to serve the whole file, (-1, -1) if unsatisfiable."""
+    m = _RANGE_RE.fullmatch(header.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if not m.group(1):
+        start, end = max(0, size - int(m.group(2))), size - 1
+    else:
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    if start >= size or start > end:
+        return (-1, -1)
+    return (start, end)
+
+
+def log_file(environ, start_response, job_id: str):
+    """Raw log bytes with Range support; X-Job-Status tells the poller when to stop."""
+    job = JOBS.get(job_id)
+    if not job:
+        start_response("404 Not Found", [("Content-Type", "text/plain")])
+        return [b"log not found"]
+    headers = [
+        ("Content-Type", "text/plain; charset=utf-8"),
+        ("Cache-Control", "no-store"),
+        ("Accept-Ranges", "bytes"),
+        ("X-Job-Status", job.status),
+    ]
+    try:
+        f = job.log_path.open("rb")
+    except FileNotFoundError:
+        # Still waiting for a worker: serve it as an empty file.
+        f = None
+    size = os.fstat(f.fileno()).st_size if f else 0
+    byte_range = parse_range(environ.get("HTTP_RANGE", ""), size)
+    if byte_range == (-1, -1):
+        if f:
+            f.close()
+        start_response("416 Range Not Satisfiable", headers + [("Content-Range", f"bytes */{size}")])
+        return [b""]
+    if byte_range:
+        start, end = byte_range
+        status = "206 Partial Content"
+        headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+    else:
+        start, end = 0, size - 1
+        status = "200 OK"
+    length = end - start + 1
+    headers.append(("Content-Length", str(length)))
+    start_response(status, headers)
+    if not f:
+        return [b""]
+    f.seek(start)
+    reader = FileRange(f, length) if byte_range else WholeFile(f, length)
+    return environ.get("wsgi.file_wrapper", FileWrapper)(reader, 65536)
+
+
+def read_form(environ) -> Dict[str, str]:
+    """Parse a urlencoded POST body into a flat dict; the read is capped at MAX_FORM_BYTES."""
+    try:
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    data = environ["wsgi.input"].read(max(0, min(length, MAX_FORM_BYTES)))
+    try:
+        return dict(parse_qsl(data.decode("utf-8", "replace"), max_num_fields=16))
+    except ValueError:
+        return {}
+
+
+def query_param(environ, name: str) -> str:
+    """First value of `name` in the query string; parsed only by the routes that take one."""
+    try:
+        pairs = parse_qsl(environ.get("QUERY_STRING", ""), max_num_fields=4)
+    except ValueError:
+        return ""
+    return next((value for key, value in pairs if key == name), "")
+
+
 def application(environ, start_response):
     method = environ.get("REQUEST_METHOD", "GET")
     path = environ.get("PATH_INFO", "/")
-    length = int(environ.get("CONTENT_LENGTH", "0") or 0)
-    query = parse_qs(environ.get("QUERY_STRING", ""))
 
     if method == "GET" and path == "/":
-        resp = render_index()
-        start_response("200 OK", [("Content-Type", "text/html; charset=utf-8")])
+        gz = accepts_gzip(environ)
+        etag = index_etag(_JOBS_VERSION, gz)
+        headers = [("ETag", etag), ("Cache-Control", "no-cache")]
+        if environ.get("HTTP_IF_NONE_MATCH") == etag:
+            start_response("304 Not Modified", headers)
+            return [b""]
+        return html_response(start_response, render_index(gz=gz), gz, headers)
+
+    if method == "GET" and path == "/jobs.json":
+        # Finished jobs never change, so only active ones are sent for the page to patch.
+        etag = index_etag(_JOBS_VERSION)
+        headers = [("ETag", etag), ("Cache-Control", "no-store")]
+        if environ.get("HTTP_IF_NONE_MATCH") == etag:
+            start_response("304 Not Modified", headers)
+            return [b""]
+        resp = json.dumps(
+            [
+                {
+                    "id": j.id,
+                    "status": j.status,
+                    "started_at": j.started_at,
+                    "target_dir": j.target_dir,
+                    "error": j.error,
+                }
+                for j in jobs_snapshot()
+                if j.status in ("queued", "running")
+            ]
+        ).encode("utf-8")
+        start_response("200 OK", [("Content-Type", "application/json")] + headers)
         return [resp]
 
     if method == "POST" and path == "/run":
-        data = environ["wsgi.input"].read(length).decode()
-        form = parse_qs(data)
-        space_url = form.get("space_url", [""])[0].strip()
-        browser = form.get("browser", ["chrome"])[0].strip() or "chrome"
-        out_root = form.get("out_root", [str(DEFAULT_OUT)])[0].strip() or str(DEFAULT_OUT)
-        quick = form.get("quick", ["0"])[0].strip() or "0"
-        quick_minutes = form.get("quick_minutes", ["2"])[0].strip() or "2"
+        form = read_form(environ)
+        space_url = form.get("space_url", "").strip()
+        browser = form.get("browser", "chrome").strip() or "chrome"
+        out_root = form.get("out_root", str(DEFAULT_OUT)).strip() or str(DEFAULT_OUT)
+        quick = form.get("quick", "0").strip() or "0"
+        quick_minutes = form.get("quick_minutes", "2").strip() or "2"
         if not space_url:
             start_response("400 Bad Request", [("Content-Type", "text/plain")])
             return [b"space_url required"]
@@ -329,14 +770,13 @@ def application(environ, start_response):
             quick_mode=quick == "1",
             quick_minutes=quick_minutes,
         )
-        JOBS[job.id] = job
+        register_job(job)
         start_response("303 See Other", [("Location", "/?msg=started")])
         return [b""]
 
     if method == "POST" and path == "/cancel":
-        data = environ["wsgi.input"].read(length).decode()
-        form = parse_qs(data)
-        job_id = form.get("id", [""])[0]
+        form = read_form(environ)
+        job_id = form.get("id", "")
         job = JOBS.get(job_id)
         if not job:
             start_response("404 Not Found", [("Content-Type", "text/plain")])
@@ -346,28 +786,59 @@ def application(environ, start_response):
         return [b""]
 
     if method == "POST" and path == "/retry":
-        data = environ["wsgi.input"].read(length).decode()
-        form = parse_qs(data)
-        job_id = form.get("id", [""])[0]
+        form = read_form(environ)
+        job_id = form.get("id", "")
         old = JOBS.get(job_id)
         if not old:
             start_response("404 Not Found", [("Content-Type", "text/plain")])
             return [b"job not found"]
         new_job = Job(space_url=old.space_url, browser=old.browser, out_root=old.out_root)
-        JOBS[new_job.id] = new_job
+        register_job(new_job)
         start_response("303 See Other", [("Location", "/?msg=retried")])
         return [b""]
 
     if method == "GET" and path == "/log":
-        job_id = (query.get("id") or [""])[0]
+        job_id = query_param(environ, "id")
+        gz = accepts_gzip(environ)
         resp = render_log(job_id)
-        start_response("200 OK", [("Content-Type", "text/html; charset=utf-8")])
-        return [resp]
+        return html_response(start_response, gzip_page(resp) if gz else resp, gz)
+
+    if method == "GET" and path == "/logfile":
+        job_id = query_param(environ, "id")
+        return log_file(environ, start_response, job_id)
 
     start_response("404 Not Found", [("Content-Type", "text/plain")])
     return [b"not found"]
 
 
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """wsgiref server that handles each request on its own thread."""
+
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+def serve(host: str, port: int) -> None:
+    threading.Thread(target=flush_logs_forever, daemon=True).start()
+    try:
+        import uvicorn
+        from a2wsgi import WSGIMiddleware
+    except ImportError:
+        uvicorn = None
+    if uvicorn is not None:
+        # uvicorn picks uvloop/httptools when installed; a2wsgi runs the WSGI app on its thread pool.
+        uvicorn.run(WSGIMiddleware(application), host=host, port=port, access_log=False)
+        return
+    with make_server(
+        host, port, application, server_class=ThreadingWSGIServer, handler_class=QuietHandler
+    ) as httpd:
+        httpd.serve_forever()
+
+
 def main():
     ap = argparse.ArgumentParser(description="Simple web UI for X Space pipeline")
     ap.add_argument("--host", default="127.0.0.1")
@@ -375,8 +846,7 @@ def main():
     args = ap.parse_args()
     print(f"[info] serving on http://{args.host}:{args.port}")
     print(f"[info] outputs root default: {DEFAULT_OUT}")
-    with make_server(args.host, args.port, application) as httpd:
-        httpd.serve_forever()
+    serve(args.host, args.port)
 
 
 if __name__ == "__main__":